@@ -2,32 +2,79 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
+from homeassistant.const import CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .api import HAmexApiClient, HAmexApiError
-from .const import DOMAIN, UPDATE_INTERVAL
+from homeassistant.util import dt as dt_util
+
+from .api import HAmexApiClient, HAmexApiError, HAmexAuthError, HAmexEndpoint
+from .config_flow import account_unique_id, create_client
+from .const import (
+    API_DASHBOARD_URL,
+    DATA_VALIDATED_CLIENTS,
+    DETECTION_SAVE_DELAY,
+    DETECTION_STORAGE_VERSION,
+    DOMAIN,
+    ENDPOINT_DASHBOARD,
+    EVENT_ANOMALY,
+    EVENT_REFILL,
+    REFRESH_DEADLINE,
+    UPDATE_INTERVAL,
+)
+from .detection import KIND_REFILL, HAmexTankDetector
+from .history import HAmexHistoryStore, HAmexHistoryView
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+# Endpoints fetched concurrently on each refresh. The dashboard feeds
+# coordinator.data, further endpoints are available in endpoint_data.
+ENDPOINTS: tuple[HAmexEndpoint, ...] = (
+    HAmexEndpoint(ENDPOINT_DASHBOARD, API_DASHBOARD_URL, required=True),
+)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the HAmex component."""
+    hass.http.register_view(HAmexHistoryView())
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HAmex from a config entry."""
-    session = async_get_clientsession(hass)
-    client = HAmexApiClient(
-        username=entry.data[CONF_USERNAME],
-        password=entry.data[CONF_PASSWORD],
-        session=session,
+    unique_id = account_unique_id(entry.data[CONF_USERNAME])
+    if entry.unique_id is None and not any(
+        other.unique_id == unique_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        # Entries created before accounts were deduplicated
+        hass.config_entries.async_update_entry(entry, unique_id=unique_id)
+
+    # Reuse the session the config flow just authenticated
+    client = hass.data.get(DATA_VALIDATED_CLIENTS, {}).pop(unique_id, None)
+    if client is None:
+        client = create_client(hass, entry.data)
+    entry.async_on_unload(client.async_close)
+
+    history = HAmexHistoryStore(hass, entry.entry_id)
+    await history.async_prune()
+
+    coordinator = HAmexDataUpdateCoordinator(
+        hass, client, history, _detection_store(hass, entry.entry_id)
     )
-
-    coordinator = HAmexDataUpdateCoordinator(hass, client)
+    coordinator.options = dict(entry.options)
+    await coordinator.async_load_detection()
 
     # Fetch initial data
     await coordinator.async_config_entry_first_refresh()
@@ -37,9 +84,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when the options changed.
+
+    Other updates, e.g. new credentials from a reauth, reload the entry
+    themselves.
+    """
+    coordinator: HAmexDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if entry.options != coordinator.options:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
@@ -48,12 +108,45 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored history and detection state of a deleted config entry."""
+    await HAmexHistoryStore(hass, entry.entry_id).async_remove()
+    await _detection_store(hass, entry.entry_id).async_remove()
+
+
+def _detection_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store of the refill and anomaly detection state."""
+    return Store(hass, DETECTION_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.detection")
+
+
+def _parse_measurement_time(value: Any) -> datetime | None:
+    """Parse a measurement timestamp, assuming local time for naive values."""
+    if not isinstance(value, str) or (parsed := dt_util.parse_datetime(value)) is None:
+        return None
+    return dt_util.as_utc(parsed)
+
+
 class HAmexDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching HAmex data."""
 
-    def __init__(self, hass: HomeAssistant, client: HAmexApiClient) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: HAmexApiClient,
+        history: HAmexHistoryStore,
+        detection_store: Store,
+        endpoints: tuple[HAmexEndpoint, ...] = ENDPOINTS,
+    ) -> None:
         """Initialize."""
         self.client = client
+        self.history = history
+        self.detector = HAmexTankDetector(_parse_measurement_time)
+        self._detection_store = detection_store
+        # Options the entities were set up with
+        self.options: dict[str, Any] = {}
+        self.endpoints = endpoints
+        self.endpoint_data: dict[str, Any] = {}
+        self.endpoint_updated: dict[str, datetime] = {}
 
         super().__init__(
             hass,
@@ -62,9 +155,71 @@ class HAmexDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
         )
 
+    async def async_load_detection(self) -> None:
+        """Load the detection state saved before the last restart or reload."""
+        if (stored := await self._detection_store.async_load()) is not None:
+            self.detector.load(stored)
+
     async def _async_update_data(self):
         """Fetch data from API."""
-        try:
-            return await self.client.get_dashboard_data()
-        except HAmexApiError as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        now = dt_util.utcnow()
+        due = [endpoint for endpoint in self.endpoints if self._is_due(endpoint, now)]
+        results = await self.client.fetch_endpoints(due, REFRESH_DEADLINE)
+
+        failed: Exception | None = None
+        for endpoint in due:
+            result = results[endpoint.key]
+            if not isinstance(result, Exception):
+                self.endpoint_data[endpoint.key] = result
+                self.endpoint_updated[endpoint.key] = now
+            elif endpoint.required:
+                failed = failed or result
+            else:
+                # Keep the previous data, the endpoint is retried next refresh
+                _LOGGER.warning("Error fetching %s data: %s", endpoint.key, result)
+
+        if isinstance(failed, HAmexAuthError):
+            raise ConfigEntryAuthFailed(f"Authentication failed: {failed}") from failed
+        if isinstance(failed, HAmexApiError):
+            raise UpdateFailed(f"Error communicating with API: {failed}") from failed
+        if failed is not None:
+            raise failed
+
+        data = self.endpoint_data[ENDPOINT_DASHBOARD]
+        self._detect_events(data, now)
+        self._detection_store.async_delay_save(
+            self.detector.as_dict, DETECTION_SAVE_DELAY
+        )
+        await self.history.async_append(data, now)
+        return data
+
+    def _is_due(self, endpoint: HAmexEndpoint, now: datetime) -> bool:
+        """Return whether an endpoint should be fetched in this refresh."""
+        if endpoint.interval is None:
+            return True
+        last = self.endpoint_updated.get(endpoint.key)
+        return last is None or now - last >= endpoint.interval
+
+    def _detect_events(self, data: dict[str, Any], now: datetime) -> None:
+        """Compare the new readings with the previous ones and fire events."""
+        for event in self.detector.process(data, now):
+            if event.kind == KIND_REFILL:
+                _LOGGER.info(
+                    "Refill of %s L detected for sensor %s",
+                    event.data["delivered"],
+                    event.sensor_id,
+                )
+                self.hass.bus.async_fire(
+                    EVENT_REFILL, {"sensor_id": event.sensor_id, **event.data}
+                )
+            else:
+                _LOGGER.warning(
+                    "Anomaly %s detected for sensor %s: %s",
+                    event.kind,
+                    event.sensor_id,
+                    event.data,
+                )
+                self.hass.bus.async_fire(
+                    EVENT_ANOMALY,
+                    {"sensor_id": event.sensor_id, "type": event.kind, **event.data},
+                )
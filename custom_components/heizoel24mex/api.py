@@ -1,12 +1,24 @@
 """API client for HAmex integration."""
 import asyncio
+from collections import deque
+import json
 import logging
-from typing import Any
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+import time
+from typing import Any, NamedTuple
 
 import aiohttp
 import async_timeout
 
-from .const import API_LOGIN_URL, API_DASHBOARD_URL
+from .const import (
+    API_DASHBOARD_URL,
+    API_LOGIN_URL,
+    DIAGNOSTICS_BODY_LENGTH,
+    DIAGNOSTICS_BUFFER_SIZE,
+    ENDPOINT_DASHBOARD,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,18 +31,77 @@ class HAmexAuthError(HAmexApiError):
     """Authentication error."""
 
 
+class HAmexResponseRecord(NamedTuple):
+    """Outcome of a single API request, kept for diagnostics."""
+
+    timestamp: float
+    request: str
+    status: int | None
+    duration: float
+    payload: Any
+    error: str | None
+
+
+@dataclass(frozen=True)
+class HAmexEndpoint:
+    """An API endpoint fetched as part of a refresh cycle."""
+
+    key: str
+    url: str
+    # Minimum time between fetches, None to fetch on every refresh
+    interval: timedelta | None = None
+    # Whether a failure of this endpoint fails the whole refresh
+    required: bool = False
+
+
 class HAmexApiClient:
     """API client for Heizoel24 MEX dashboard."""
 
-    def __init__(self, username: str, password: str, session: aiohttp.ClientSession) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        session: aiohttp.ClientSession,
+        history_size: int = DIAGNOSTICS_BUFFER_SIZE,
+    ) -> None:
         """Initialize the API client."""
         self._username = username
         self._password = password
         self._session = session
         self._authenticated = False
+        self._auth_lock = asyncio.Lock()
+        self._auth_generation = 0
+        # Last responses, oldest first; payloads are kept by reference
+        self.responses: deque[HAmexResponseRecord] = deque(maxlen=history_size)
+
+    async def async_close(self) -> None:
+        """Close the session of this client."""
+        await self._session.close()
+
+    def _record(
+        self,
+        request: str,
+        started: float,
+        status: int | None,
+        payload: Any = None,
+        error: str | None = None,
+    ) -> None:
+        """Remember the outcome of a request."""
+        self.responses.append(
+            HAmexResponseRecord(
+                time.time(),
+                request,
+                status,
+                time.monotonic() - started,
+                payload,
+                error,
+            )
+        )
 
     async def authenticate(self) -> bool:
         """Authenticate with the API using cookie-based session."""
+        started = time.monotonic()
+        status = None
         try:
             async with async_timeout.timeout(10):
                 response = await self._session.post(
@@ -42,8 +113,12 @@ class HAmexApiClient:
                         }
                     },
                 )
+                status = response.status
 
                 if response.status == 401:
+                    self._record(
+                        "login", started, status, error="Invalid username or password"
+                    )
                     raise HAmexAuthError("Invalid username or password")
 
                 response.raise_for_status()
@@ -52,45 +127,140 @@ class HAmexApiClient:
                 # Check if login was successful
                 if not data.get("Success"):
                     _LOGGER.error("Login failed: %s", data)
+                    self._record("login", started, status, data, "Login failed")
                     raise HAmexAuthError("Login failed")
 
                 self._authenticated = True
+                self._auth_generation += 1
+                self._record("login", started, status)
                 _LOGGER.debug("Successfully authenticated")
                 return True
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Connection error during authentication: %s", err)
+            self._record("login", started, status, error=str(err))
             raise HAmexApiError(f"Connection error: {err}") from err
         except asyncio.TimeoutError as err:
             _LOGGER.error("Timeout during authentication")
+            self._record("login", started, status, error="Timeout")
             raise HAmexApiError("Timeout during authentication") from err
 
-    async def get_dashboard_data(self) -> dict[str, Any]:
-        """Get dashboard data from the API."""
-        if not self._authenticated:
-            await self.authenticate()
+    async def _async_ensure_authenticated(self, generation: int | None = None) -> None:
+        """Log in once for all concurrent requests.
 
+        Requests which got rejected pass the login generation they were sent
+        with, so only the first of them logs in again.
+        """
+        async with self._auth_lock:
+            if generation is None:
+                if not self._authenticated:
+                    await self.authenticate()
+            elif generation == self._auth_generation:
+                await self.authenticate()
+
+    async def get_json(self, request: str, url: str) -> Any:
+        """Get a JSON document from the API, re-authenticating if needed."""
+        await self._async_ensure_authenticated()
+
+        started = time.monotonic()
+        status = None
+        # Raw body of responses which were not OK or not JSON
+        body: str | None = None
         try:
             async with async_timeout.timeout(10):
-                response = await self._session.get(API_DASHBOARD_URL)
+                generation = self._auth_generation
+                response = await self._session.get(url)
 
                 if response.status == 401:
                     # Session expired, try to re-authenticate
                     _LOGGER.debug("Session expired, re-authenticating")
-                    await self.authenticate()
+                    await self._async_ensure_authenticated(generation)
 
                     # Retry with new session
-                    response = await self._session.get(API_DASHBOARD_URL)
+                    response = await self._session.get(url)
 
-                response.raise_for_status()
-                data = await response.json()
+                status = response.status
+                text = await response.text()
+                if not response.ok:
+                    body = text
+                    response.raise_for_status()
 
-                _LOGGER.debug("Successfully retrieved dashboard data")
+                try:
+                    data = json.loads(text)
+                except ValueError as err:
+                    body = text
+                    raise HAmexApiError(f"Invalid JSON in {request} response") from err
+
+                self._record(request, started, status, data)
+                _LOGGER.debug("Successfully retrieved %s data", request)
                 return data
 
+        except HAmexApiError as err:
+            _LOGGER.error("Error while fetching %s data: %s", request, err)
+            self._record(request, started, status, _truncate(body), str(err))
+            raise
         except aiohttp.ClientError as err:
-            _LOGGER.error("Connection error while fetching data: %s", err)
+            _LOGGER.error("Connection error while fetching %s data: %s", request, err)
+            self._record(request, started, status, _truncate(body), str(err))
             raise HAmexApiError(f"Connection error: {err}") from err
         except asyncio.TimeoutError as err:
-            _LOGGER.error("Timeout while fetching data")
-            raise HAmexApiError("Timeout while fetching data") from err
+            _LOGGER.error("Timeout while fetching %s data", request)
+            self._record(request, started, status, error="Timeout")
+            raise HAmexApiError(f"Timeout while fetching {request} data") from err
+        except asyncio.CancelledError:
+            # E.g. the refresh deadline of fetch_endpoints expired
+            self._record(request, started, status, error="Cancelled")
+            raise
+        except Exception as err:
+            self._record(request, started, status, _truncate(body), repr(err))
+            raise
+
+    async def get_dashboard_data(self) -> dict[str, Any]:
+        """Get dashboard data from the API."""
+        return await self.get_json(ENDPOINT_DASHBOARD, API_DASHBOARD_URL)
+
+    async def fetch_endpoints(
+        self, endpoints: Iterable[HAmexEndpoint], deadline: float
+    ) -> dict[str, Any]:
+        """Fetch several endpoints concurrently within one deadline.
+
+        Returns the data or the raised exception per endpoint key, so one
+        failing endpoint does not discard the others.
+        """
+        tasks = {
+            endpoint.key: asyncio.ensure_future(
+                self.get_json(endpoint.key, endpoint.url)
+            )
+            for endpoint in endpoints
+        }
+        if not tasks:
+            return {}
+
+        try:
+            await asyncio.wait(tasks.values(), timeout=deadline)
+        finally:
+            # Also reached when the caller is cancelled, e.g. on unload
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+        results: dict[str, Any] = {}
+        for key, task in tasks.items():
+            if task.cancelled():
+                results[key] = HAmexApiError(
+                    f"Deadline exceeded while fetching {key} data"
+                )
+            elif (err := task.exception()) is not None:
+                results[key] = err
+            else:
+                results[key] = task.result()
+        return results
+
+
+def _truncate(body: str | None) -> str | None:
+    """Shorten a raw response body for diagnostics."""
+    if body is None or len(body) <= DIAGNOSTICS_BODY_LENGTH:
+        return body
+    return f"{body[:DIAGNOSTICS_BODY_LENGTH]}..."
@@ -2,17 +2,26 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import HAmexApiClient, HAmexAuthError, HAmexApiError
-from .const import DOMAIN
+from .const import (
+    CONF_DEADBAND_MAX_INTERVAL,
+    DATA_VALIDATED_CLIENTS,
+    DEFAULT_DEADBAND_MAX_INTERVAL,
+    DEFAULT_DEADBANDS,
+    DOMAIN,
+)
+from .deadband import parse_deadband
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,21 +32,50 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PASSWORD): str,
+    }
+)
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect."""
-    session = async_get_clientsession(hass)
-    client = HAmexApiClient(
+
+def account_unique_id(username: str) -> str:
+    """Return the unique id of the config entry for an account."""
+    return username.strip().lower()
+
+
+@callback
+def create_client(hass: HomeAssistant, data: Mapping[str, Any]) -> HAmexApiClient:
+    """Create an API client with its own session.
+
+    Login is cookie based, so every account needs its own cookie jar
+    instead of the shared Home Assistant session.
+    """
+    session = async_create_clientsession(hass, cookie_jar=aiohttp.CookieJar())
+    return HAmexApiClient(
         username=data[CONF_USERNAME],
         password=data[CONF_PASSWORD],
         session=session,
     )
 
+
+async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the user input allows us to connect.
+
+    The authenticated client is returned so the config entry can reuse
+    the session instead of logging in again.
+    """
+    client = create_client(hass, data)
+
     # Test authentication
-    await client.authenticate()
+    try:
+        await client.authenticate()
+    except Exception:
+        await client.async_close()
+        raise
 
     # Return info to store in the config entry
-    return {"title": f"HAmex ({data[CONF_USERNAME]})"}
+    return {"title": f"HAmex ({data[CONF_USERNAME]})", "client": client}
 
 
 class HAmexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -45,6 +83,14 @@ class HAmexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> HAmexOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return HAmexOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -52,16 +98,15 @@ class HAmexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            try:
-                info = await validate_input(self.hass, user_input)
-            except HAmexAuthError:
-                errors["base"] = "invalid_auth"
-            except HAmexApiError:
-                errors["base"] = "cannot_connect"
-            except Exception:  # pylint: disable=broad-except
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
-            else:
+            unique_id = account_unique_id(user_input[CONF_USERNAME])
+            await self.async_set_unique_id(unique_id)
+            self._abort_if_unique_id_configured()
+
+            info, errors = await self._async_validate(user_input)
+            if not errors:
+                self.hass.data.setdefault(DATA_VALIDATED_CLIENTS, {})[
+                    unique_id
+                ] = info["client"]
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
@@ -69,3 +114,91 @@ class HAmexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle re-authentication after the stored credentials were rejected."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for a new password of the account."""
+        errors: dict[str, str] = {}
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        assert entry is not None
+
+        if user_input is not None:
+            data = {**entry.data, CONF_PASSWORD: user_input[CONF_PASSWORD]}
+            info, errors = await self._async_validate(data)
+            if not errors:
+                self.hass.data.setdefault(DATA_VALIDATED_CLIENTS, {})[
+                    account_unique_id(data[CONF_USERNAME])
+                ] = info["client"]
+                return self.async_update_reload_and_abort(entry, data=data)
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            description_placeholders={CONF_USERNAME: entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
+    async def _async_validate(
+        self, data: dict[str, Any]
+    ) -> tuple[dict[str, Any], dict[str, str]]:
+        """Validate the credentials and map failures to form errors."""
+        errors: dict[str, str] = {}
+        info: dict[str, Any] = {}
+
+        try:
+            info = await validate_input(self.hass, data)
+        except HAmexAuthError:
+            errors["base"] = "invalid_auth"
+        except HAmexApiError:
+            errors["base"] = "cannot_connect"
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected exception")
+            errors["base"] = "unknown"
+
+        return info, errors
+
+
+class HAmexOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle HAmex options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the deadbands of the tank sensors."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            for key in DEFAULT_DEADBANDS:
+                try:
+                    parse_deadband(user_input[key])
+                except ValueError:
+                    errors[key] = "invalid_deadband"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                **{
+                    vol.Required(key, default=options.get(key, default)): str
+                    for key, default in DEFAULT_DEADBANDS.items()
+                },
+                vol.Required(
+                    CONF_DEADBAND_MAX_INTERVAL,
+                    default=options.get(
+                        CONF_DEADBAND_MAX_INTERVAL, DEFAULT_DEADBAND_MAX_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -1,5 +1,7 @@
 """Constants for the HAmex integration."""
 
+from datetime import timedelta
+
 DOMAIN = "heizoel24mex"
 
 # API endpoints
@@ -12,3 +14,46 @@ CONF_PASSWORD = "password"
 
 # Update interval
 UPDATE_INTERVAL = 3600  # 60 minutes
+
+# Events
+EVENT_REFILL = f"{DOMAIN}_refill"
+EVENT_ANOMALY = f"{DOMAIN}_anomaly"
+
+# Refill and anomaly detection
+DETECTION_REFILL_MIN_LITERS = 100  # increase between two measurements
+DETECTION_DROP_MIN_LITERS = 200  # decrease between two measurements
+DETECTION_DROP_CONFIRM_READINGS = 3  # low readings before a drop is accepted
+DETECTION_STUCK_READINGS = 6  # new measurements with identical volume
+DETECTION_STALE_AFTER = timedelta(hours=48)  # without a new measurement
+DETECTION_EVICT_AFTER = 24  # refreshes a tank is missing before it is forgotten
+DETECTION_STORAGE_VERSION = 1
+DETECTION_SAVE_DELAY = 10  # seconds
+
+# Clients authenticated by the config flow, handed over to the new entry
+DATA_VALIDATED_CLIENTS = f"{DOMAIN}_validated_clients"
+
+# History export
+HISTORY_RETENTION = timedelta(days=730)
+HISTORY_EXPORT_CHUNK_ROWS = 500
+
+# Diagnostics
+DIAGNOSTICS_BUFFER_SIZE = 10  # API responses kept per account
+DIAGNOSTICS_BODY_LENGTH = 2000  # characters kept of non-JSON or failed responses
+
+# Endpoints fetched per refresh
+ENDPOINT_DASHBOARD = "dashboard"
+REFRESH_DEADLINE = 30  # seconds for all endpoints of a refresh
+
+# Deadbands, a number for an absolute or e.g. "2%" for a relative change
+CONF_DEADBAND_VOLUME = "deadband_volume"
+CONF_DEADBAND_PERCENTAGE = "deadband_percentage"
+CONF_DEADBAND_BATTERY = "deadband_battery"
+CONF_DEADBAND_MAX_INTERVAL = "deadband_max_interval"
+
+# Disabled by default, every change is published until configured
+DEFAULT_DEADBANDS = {
+    CONF_DEADBAND_VOLUME: "0",  # L
+    CONF_DEADBAND_PERCENTAGE: "0",  # percentage points
+    CONF_DEADBAND_BATTERY: "0",  # percentage points
+}
+DEFAULT_DEADBAND_MAX_INTERVAL = 6  # hours, publish unchanged values anyway
@@ -0,0 +1,18 @@
+"""Deadband helpers for HAmex integration."""
+from __future__ import annotations
+
+import math
+
+
+def parse_deadband(value: str) -> tuple[float, bool]:
+    """Parse a deadband into its width and whether it is relative.
+
+    "5" is an absolute change of 5 units, "2%" a change of 2 percent of the
+    last published value.
+    """
+    value = value.strip()
+    relative = value.endswith("%")
+    width = float(value.rstrip("%"))
+    if not math.isfinite(width) or width < 0:
+        raise ValueError(f"Invalid deadband: {value}")
+    return width, relative
@@ -0,0 +1,258 @@
+"""Refill and anomaly detection for HAmex tank readings."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+from typing import Any
+
+from .const import (
+    DETECTION_DROP_CONFIRM_READINGS,
+    DETECTION_DROP_MIN_LITERS,
+    DETECTION_EVICT_AFTER,
+    DETECTION_REFILL_MIN_LITERS,
+    DETECTION_STALE_AFTER,
+    DETECTION_STUCK_READINGS,
+)
+
+KIND_REFILL = "refill"
+ANOMALY_DROP = "implausible_drop"
+ANOMALY_STALE = "stale_measurement"
+ANOMALY_STUCK = "stuck_sensor"
+
+
+@dataclass
+class TankDetectionState:
+    """Bounded detection state kept for a single tank."""
+
+    volume: float | None = None
+    measured_at: Any = None
+    measured_changed_at: datetime | None = None
+    unchanged_readings: int = 0
+    stale_reported: bool = False
+    stuck_reported: bool = False
+    last_refill_volume: float | None = None
+    last_refill_time: datetime | None = None
+    missing_refreshes: int = 0
+    # Readings below the baseline since an implausible drop
+    drop_readings: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        data = asdict(self)
+        for key in _DATETIME_FIELDS:
+            if data[key] is not None:
+                data[key] = data[key].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TankDetectionState:
+        """Create the state from its JSON representation."""
+        known = {field.name for field in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for key in _DATETIME_FIELDS:
+            if values.get(key) is not None:
+                values[key] = datetime.fromisoformat(values[key])
+        return cls(**values)
+
+
+_DATETIME_FIELDS = ("measured_changed_at", "last_refill_time")
+
+
+@dataclass
+class TankEvent:
+    """A refill or anomaly detected for a tank."""
+
+    sensor_id: int
+    kind: str
+    data: dict[str, Any]
+
+
+class HAmexTankDetector:
+    """Compare successive tank readings to detect refills and anomalies.
+
+    Only the previous reading of each tank is kept, so the state does not
+    grow with the history and no recorder access is required. The state can
+    be saved with as_dict and loaded again, so readings delivered across a
+    restart are still compared.
+    """
+
+    def __init__(
+        self, parse_time: Callable[[Any], datetime | None] | None = None
+    ) -> None:
+        """Initialize the detector.
+
+        parse_time converts a LastMeasurementTimeStamp into an aware datetime.
+        """
+        self._tanks: dict[int, TankDetectionState] = {}
+        self._parse_time = parse_time
+
+    def get(self, sensor_id: int) -> TankDetectionState | None:
+        """Return the detection state for a tank."""
+        return self._tanks.get(sensor_id)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of all tanks for storage."""
+        return {
+            "tanks": [
+                {"sensor_id": sensor_id, **state.as_dict()}
+                for sensor_id, state in self._tanks.items()
+            ]
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Load the state of all tanks from storage."""
+        self._tanks = {
+            tank["sensor_id"]: TankDetectionState.from_dict(tank)
+            for tank in data.get("tanks", [])
+        }
+
+    def process(self, data: dict[str, Any] | None, now: datetime) -> list[TankEvent]:
+        """Process a dashboard payload and return the detected events."""
+        events: list[TankEvent] = []
+        if not data or "Items" not in data:
+            return events
+
+        seen: set[int] = set()
+        for tank in data["Items"]:
+            sensor_id = tank.get("SensorId")
+            if sensor_id is None:
+                continue
+            seen.add(sensor_id)
+            events.extend(self._process_tank(sensor_id, tank, now))
+
+        # Forget tanks which are missing from several payloads in a row,
+        # a single incomplete payload keeps the baseline and last refill
+        for sensor_id in self._tanks.keys() - seen:
+            state = self._tanks[sensor_id]
+            state.missing_refreshes += 1
+            if state.missing_refreshes >= DETECTION_EVICT_AFTER:
+                del self._tanks[sensor_id]
+
+        return events
+
+    def _process_tank(
+        self, sensor_id: int, tank: dict[str, Any], now: datetime
+    ) -> list[TankEvent]:
+        """Compare a tank reading with the previous one."""
+        state = self._tanks.setdefault(sensor_id, TankDetectionState())
+        state.missing_refreshes = 0
+        volume = tank.get("CurrentVolume")
+        measured_at = tank.get("LastMeasurementTimeStamp")
+        events: list[TankEvent] = []
+
+        if state.measured_changed_at is None:
+            # First reading, nothing to compare against yet
+            state.volume = volume
+            state.measured_at = measured_at
+            state.measured_changed_at = now
+            return events
+
+        if measured_at == state.measured_at:
+            # No new measurement since the last refresh
+            if (
+                not state.stale_reported
+                and now - state.measured_changed_at >= DETECTION_STALE_AFTER
+            ):
+                state.stale_reported = True
+                events.append(
+                    TankEvent(
+                        sensor_id,
+                        ANOMALY_STALE,
+                        {
+                            "last_measurement": measured_at,
+                            "stale_hours": round(
+                                (now - state.measured_changed_at) / timedelta(hours=1), 1
+                            ),
+                        },
+                    )
+                )
+            return events
+
+        previous = state.volume
+        state.measured_at = measured_at
+        state.measured_changed_at = now
+        state.stale_reported = False
+
+        if volume is None or previous is None:
+            state.volume = volume
+            state.unchanged_readings = 0
+            return events
+
+        delta = volume - previous
+
+        if state.drop_readings and -delta >= DETECTION_DROP_MIN_LITERS:
+            # Still below the level before an implausible drop, only accept
+            # the new level once it was measured several times
+            state.drop_readings += 1
+            if state.drop_readings >= DETECTION_DROP_CONFIRM_READINGS:
+                state.drop_readings = 0
+                state.volume = volume
+            return events
+        state.drop_readings = 0
+
+        if delta >= DETECTION_REFILL_MIN_LITERS:
+            state.last_refill_volume = round(delta, 1)
+            state.last_refill_time = self._measurement_time(measured_at, now)
+            events.append(
+                TankEvent(
+                    sensor_id,
+                    KIND_REFILL,
+                    {
+                        "delivered": state.last_refill_volume,
+                        "volume_before": previous,
+                        "volume_after": volume,
+                        "last_measurement": measured_at,
+                    },
+                )
+            )
+        elif -delta >= DETECTION_DROP_MIN_LITERS:
+            # Keep the previous level as baseline, so a glitch which recovers
+            # is not reported as a delivery
+            state.drop_readings = 1
+            events.append(
+                TankEvent(
+                    sensor_id,
+                    ANOMALY_DROP,
+                    {
+                        "drop": round(-delta, 1),
+                        "volume_before": previous,
+                        "volume_after": volume,
+                        "last_measurement": measured_at,
+                    },
+                )
+            )
+            return events
+
+        if delta == 0:
+            state.unchanged_readings += 1
+            if (
+                not state.stuck_reported
+                and state.unchanged_readings >= DETECTION_STUCK_READINGS
+                and tank.get("Usage")
+            ):
+                state.stuck_reported = True
+                events.append(
+                    TankEvent(
+                        sensor_id,
+                        ANOMALY_STUCK,
+                        {
+                            "volume": volume,
+                            "unchanged_readings": state.unchanged_readings,
+                            "last_measurement": measured_at,
+                        },
+                    )
+                )
+        else:
+            state.unchanged_readings = 0
+            state.stuck_reported = False
+
+        state.volume = volume
+        return events
+
+    def _measurement_time(self, measured_at: Any, now: datetime) -> datetime:
+        """Return the time of a measurement, or now if it cannot be parsed."""
+        if self._parse_time is not None and measured_at is not None:
+            if (parsed := self._parse_time(measured_at)) is not None:
+                return parsed
+        return now
@@ -0,0 +1,57 @@
+"""Diagnostics support for HAmex integration."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import HAmexDataUpdateCoordinator
+from .const import DOMAIN
+
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    "unique_id",
+    "title",
+    "UserName",
+    "Password",
+    "Email",
+    "ZipCode",
+    "zip_code",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: HAmexDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # Redaction only happens here, recording a response is a plain append
+    responses = [
+        {
+            "time": datetime.fromtimestamp(record.timestamp, timezone.utc).isoformat(),
+            "request": record.request,
+            "status": record.status,
+            "duration_ms": round(record.duration * 1000, 1),
+            "error": record.error,
+            "payload": async_redact_data(record.payload, TO_REDACT)
+            if record.payload is not None
+            else None,
+        }
+        for record in coordinator.client.responses
+    ]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "endpoint_updated": {
+            key: updated.isoformat()
+            for key, updated in coordinator.endpoint_updated.items()
+        },
+        "responses": responses,
+    }
@@ -0,0 +1,326 @@
+"""Tank and price history store and export view for HAmex integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+import csv
+from datetime import datetime
+from http import HTTPStatus
+import io
+import json
+import logging
+import os
+from typing import Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import Unauthorized
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, HISTORY_EXPORT_CHUNK_ROWS, HISTORY_RETENTION
+
+_LOGGER = logging.getLogger(__name__)
+
+KIND_TANK = "tank"
+KIND_PRICE = "price"
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+CSV_COLUMNS = (
+    "time",
+    "kind",
+    "sensor_id",
+    "volume",
+    "percentage",
+    "battery",
+    "usage",
+    "measured_at",
+    "price_compared_to_yesterday",
+    "price_forecast",
+)
+
+
+class HAmexHistoryStore:
+    """Append-only history of tank readings and prices for a config entry.
+
+    Rows are stored as one JSON object per line in chronological order, so
+    exports can be streamed from disk without loading the whole file.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._hass = hass
+        self.path = hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.history")
+        self._last_measurement: dict[int, Any] = {}
+        self._last_price: tuple[Any, Any] | None = None
+
+    async def async_append(self, data: dict[str, Any] | None, now: datetime) -> None:
+        """Append new measurements and price changes from a dashboard payload."""
+        rows = self._rows_from_dashboard(data, now)
+        if not rows:
+            return
+
+        try:
+            await self._hass.async_add_executor_job(self._write_rows, rows)
+        except OSError as err:
+            _LOGGER.error("Could not write history to %s: %s", self.path, err)
+
+    async def async_prune(self) -> None:
+        """Drop rows older than the retention period.
+
+        The last stored measurement of every tank and the last price are
+        remembered, so a restart does not append them again.
+        """
+        try:
+            await self._hass.async_add_executor_job(
+                self._prune, dt_util.utcnow() - HISTORY_RETENTION
+            )
+        except OSError as err:
+            _LOGGER.error("Could not prune history in %s: %s", self.path, err)
+
+    async def async_remove(self) -> None:
+        """Remove the history file."""
+        try:
+            await self._hass.async_add_executor_job(os.remove, self.path)
+        except FileNotFoundError:
+            pass
+
+    def _rows_from_dashboard(
+        self, data: dict[str, Any] | None, now: datetime
+    ) -> list[dict[str, Any]]:
+        """Build the rows which changed since the last refresh."""
+        rows: list[dict[str, Any]] = []
+        if not data:
+            return rows
+
+        time = now.isoformat()
+
+        for tank in data.get("Items", []):
+            sensor_id = tank.get("SensorId")
+            measured_at = tank.get("LastMeasurementTimeStamp")
+            if self._last_measurement.get(sensor_id) == measured_at:
+                continue
+            self._last_measurement[sensor_id] = measured_at
+            rows.append(
+                {
+                    "time": time,
+                    "kind": KIND_TANK,
+                    "sensor_id": sensor_id,
+                    "volume": tank.get("CurrentVolume"),
+                    "percentage": tank.get("CurrentVolumePercentage"),
+                    "battery": tank.get("BatteryPercentage"),
+                    "usage": tank.get("Usage"),
+                    "measured_at": measured_at,
+                }
+            )
+
+        price = (
+            data.get("PriceComparedToYesterdayPercentage"),
+            data.get("PriceForecastPercentage"),
+        )
+        if price != self._last_price and price != (None, None):
+            self._last_price = price
+            rows.append(
+                {
+                    "time": time,
+                    "kind": KIND_PRICE,
+                    "price_compared_to_yesterday": price[0],
+                    "price_forecast": price[1],
+                }
+            )
+
+        return rows
+
+    def _write_rows(self, rows: list[dict[str, Any]]) -> None:
+        """Append rows to the history file."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def _prune(self, cutoff: datetime) -> None:
+        """Rewrite the history file without rows older than cutoff."""
+        if not os.path.exists(self.path):
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, encoding="utf-8") as source, open(
+            tmp_path, "w", encoding="utf-8"
+        ) as target:
+            for line in source:
+                if (row := _parse_line(line)) is None:
+                    continue
+                self._remember(row)
+                if _row_time(row) >= cutoff:
+                    target.write(line)
+        os.replace(tmp_path, self.path)
+
+    def _remember(self, row: dict[str, Any]) -> None:
+        """Remember a stored row for deduplicating the next appends."""
+        if row["kind"] == KIND_TANK:
+            self._last_measurement[row["sensor_id"]] = row["measured_at"]
+        elif row["kind"] == KIND_PRICE:
+            self._last_price = (
+                row["price_compared_to_yesterday"],
+                row["price_forecast"],
+            )
+
+    def iter_rows(
+        self,
+        start: datetime | None,
+        end: datetime | None,
+        interval: int | None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield rows within the time range, downsampled to one per interval.
+
+        Downsampling keeps the first row of every series in each interval,
+        so memory only grows with the number of tanks.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        last_bucket: dict[tuple[str, Any], int] = {}
+
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if (row := _parse_line(line)) is None:
+                    continue
+
+                time = _row_time(row)
+                if start is not None and time < start:
+                    continue
+                if end is not None and time >= end:
+                    # Rows are appended in chronological order
+                    break
+
+                if interval:
+                    series = (row["kind"], row.get("sensor_id"))
+                    bucket = int(time.timestamp()) // interval
+                    if last_bucket.get(series) == bucket:
+                        continue
+                    last_bucket[series] = bucket
+
+                yield row
+
+    def iter_export(
+        self,
+        start: datetime | None,
+        end: datetime | None,
+        interval: int | None,
+        export_format: str,
+    ) -> Iterator[bytes]:
+        """Yield the encoded export in chunks of HISTORY_EXPORT_CHUNK_ROWS rows."""
+        buffer = io.StringIO()
+        writer = None
+        rows = 0
+
+        if export_format == "csv":
+            writer = csv.DictWriter(buffer, CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+
+        for row in self.iter_rows(start, end, interval):
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(row) + "\n")
+
+            rows += 1
+            if rows >= HISTORY_EXPORT_CHUNK_ROWS:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                rows = 0
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+
+def _parse_line(line: str) -> dict[str, Any] | None:
+    """Parse a history line, skipping partially written ones."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def _row_time(row: dict[str, Any]) -> datetime:
+    """Return the time of a history row."""
+    return datetime.fromisoformat(row["time"])
+
+
+class HAmexHistoryView(HomeAssistantView):
+    """Stream the tank and price history of a config entry."""
+
+    url = f"/api/{DOMAIN}/history/{{entry_id}}"
+    name = f"api:{DOMAIN}:history"
+    requires_auth = True
+
+    async def get(self, request: web.Request, entry_id: str) -> web.StreamResponse:
+        """Stream the history as NDJSON or CSV.
+
+        Query parameters: start and end (ISO 8601), interval (seconds between
+        samples of a series) and format (ndjson or csv).
+        """
+        if not request["hass_user"].is_admin:
+            raise Unauthorized()
+
+        hass: HomeAssistant = request.app["hass"]
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+        if coordinator is None:
+            return self.json_message("Unknown config entry", HTTPStatus.NOT_FOUND)
+
+        query = request.query
+        export_format = query.get("format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return self.json_message("Invalid format", HTTPStatus.BAD_REQUEST)
+
+        try:
+            start = _parse_time(query.get("start"))
+            end = _parse_time(query.get("end"))
+            interval = int(query["interval"]) if "interval" in query else None
+        except ValueError:
+            return self.json_message("Invalid parameter", HTTPStatus.BAD_REQUEST)
+
+        if interval is not None and interval <= 0:
+            return self.json_message("Invalid interval", HTTPStatus.BAD_REQUEST)
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/csv"
+                if export_format == "csv"
+                else "application/x-ndjson",
+            }
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        chunks = coordinator.history.iter_export(start, end, interval, export_format)
+        pending: asyncio.Future[bytes | None] | None = None
+        try:
+            while True:
+                pending = hass.async_add_executor_job(next, chunks, None)
+                # Shielded, so a disconnect does not abandon a running next()
+                chunk = await asyncio.shield(pending)
+                pending = None
+                if chunk is None:
+                    break
+                await response.write(chunk)
+        finally:
+            if pending is not None:
+                # The generator can only be closed once next() returned
+                await asyncio.wait([pending])
+            chunks.close()
+
+        await response.write_eof()
+        return response
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    """Parse a time query parameter, assuming local time for naive values."""
+    if value is None:
+        return None
+    if (parsed := dt_util.parse_datetime(value)) is None:
+        raise ValueError(f"Invalid time: {value}")
+    return dt_util.as_utc(parsed)
@@ -1,7 +1,7 @@
 """Sensor platform for HAmex integration."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from typing import Any
 
@@ -12,13 +12,23 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE, UnitOfVolume
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from . import HAmexDataUpdateCoordinator
-from .const import DOMAIN
+from .const import (
+    CONF_DEADBAND_BATTERY,
+    CONF_DEADBAND_MAX_INTERVAL,
+    CONF_DEADBAND_PERCENTAGE,
+    CONF_DEADBAND_VOLUME,
+    DEFAULT_DEADBAND_MAX_INTERVAL,
+    DEFAULT_DEADBANDS,
+    DOMAIN,
+)
+from .deadband import parse_deadband
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +75,14 @@ async def async_setup_entry(
                 HAmexRemainingDaysSensor(coordinator, sensor_id, tank_id, tank_name, entry)
             )
 
+            # Last detected refill
+            entities.append(
+                HAmexLastRefillSensor(coordinator, sensor_id, tank_id, tank_name, entry)
+            )
+            entities.append(
+                HAmexLastRefillTimeSensor(coordinator, sensor_id, tank_id, tank_name, entry)
+            )
+
         # Add total/summary sensors (virtual device) only if multiple tanks exist
         if len(coordinator.data["Items"]) > 1:
             entities.append(HAmexTotalVolumeSensor(coordinator, entry))
@@ -104,12 +122,107 @@ def _get_summary_device_info(entry: ConfigEntry) -> DeviceInfo:
     )
 
 
+class HAmexDeadbandMixin:
+    """Only write a new state when the value left the deadband.
+
+    The deadband is centered on the last published value, so jitter around
+    it is suppressed. After the maximum interval the value is published
+    anyway, a change of the measurement result immediately. The attributes
+    are published together with the value, so both always match.
+    """
+
+    _deadband: tuple[float, bool]
+    _deadband_max_interval: timedelta
+    _published_at: datetime | None = None
+    _published_available: bool | None = None
+    _published_attributes: dict[str, Any] = {}
+    _published_measurement_ok: bool | None = None
+
+    def _setup_deadband(self, entry: ConfigEntry, option: str) -> None:
+        """Read the deadband of this sensor kind from the entry options."""
+        self._deadband = parse_deadband(
+            entry.options.get(option, DEFAULT_DEADBANDS[option])
+        )
+        self._deadband_max_interval = timedelta(
+            hours=entry.options.get(
+                CONF_DEADBAND_MAX_INTERVAL, DEFAULT_DEADBAND_MAX_INTERVAL
+            )
+        )
+
+    def _get_tank_data(self) -> dict[str, Any] | None:
+        """Get tank data from coordinator."""
+        raise NotImplementedError
+
+    def _current_value(self) -> float | None:
+        """Return the current value from the coordinator data."""
+        raise NotImplementedError
+
+    def _current_attributes(self) -> dict[str, Any]:
+        """Return the current attributes from the coordinator data."""
+        raise NotImplementedError
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the attributes published with the current value."""
+        return self._published_attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Publish the initial value."""
+        self._publish(self._current_value())
+        await super().async_added_to_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the value changed significantly."""
+        value = self._current_value()
+        if self._is_significant(value):
+            self._publish(value)
+            super()._handle_coordinator_update()
+
+    def _measurement_ok(self) -> bool | None:
+        """Return whether the last measurement of the tank was successful."""
+        tank = self._get_tank_data()
+        return tank.get("LastMeasurementWasSuccessfully") if tank else None
+
+    def _publish(self, value: float | None) -> None:
+        """Remember the value and attributes written to the state machine."""
+        self._attr_native_value = value
+        self._published_attributes = self._current_attributes()
+        self._published_measurement_ok = self._measurement_ok()
+        self._published_at = dt_util.utcnow()
+        self._published_available = self.available
+
+    def _is_significant(self, value: float | None) -> bool:
+        """Return whether the value should be published."""
+        width, relative = self._deadband
+        if not width:
+            # Deadband disabled, publish every update as before
+            return True
+
+        previous = self._attr_native_value
+        if self.available != self._published_available:
+            return True
+        if self._measurement_ok() != self._published_measurement_ok:
+            return True
+        if value is None or previous is None:
+            return value != previous
+        if self._published_at is None:
+            return True
+
+        if dt_util.utcnow() - self._published_at >= self._deadband_max_interval:
+            return True
+
+        threshold = abs(previous) * width / 100 if relative else width
+        change = abs(value - previous)
+        return change > 0 and change >= threshold
+
+
 # =============================================================================
 # Tank Sensors (individual devices)
 # =============================================================================
 
 
-class HAmexTankPercentageSensor(CoordinatorEntity, SensorEntity):
+class HAmexTankPercentageSensor(HAmexDeadbandMixin, CoordinatorEntity, SensorEntity):
     """Sensor for tank fill percentage."""
 
     def __init__(
@@ -131,15 +244,14 @@ class HAmexTankPercentageSensor(CoordinatorEntity, SensorEntity):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:gauge"
         self._attr_device_info = _get_tank_device_info(tank_id, tank_name, entry)
+        self._setup_deadband(entry, CONF_DEADBAND_PERCENTAGE)
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
+    def _current_value(self) -> float | None:
+        """Return the current fill percentage."""
         tank = self._get_tank_data()
         return tank.get("CurrentVolumePercentage") if tank else None
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
+    def _current_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
         tank = self._get_tank_data()
         if not tank:
@@ -164,7 +276,7 @@ class HAmexTankPercentageSensor(CoordinatorEntity, SensorEntity):
         return None
 
 
-class HAmexTankVolumeSensor(CoordinatorEntity, SensorEntity):
+class HAmexTankVolumeSensor(HAmexDeadbandMixin, CoordinatorEntity, SensorEntity):
     """Sensor for tank volume in liters."""
 
     def __init__(
@@ -188,17 +300,16 @@ class HAmexTankVolumeSensor(CoordinatorEntity, SensorEntity):
         self._attr_icon = "mdi:oil-temperature"
         self._attr_suggested_display_precision = 0
         self._attr_device_info = _get_tank_device_info(tank_id, tank_name, entry)
+        self._setup_deadband(entry, CONF_DEADBAND_VOLUME)
 
-    @property
-    def native_value(self) -> int | None:
-        """Return the state of the sensor."""
+    def _current_value(self) -> int | None:
+        """Return the current volume."""
         tank = self._get_tank_data()
         if tank and tank.get("CurrentVolume") is not None:
             return int(tank.get("CurrentVolume"))
         return None
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
+    def _current_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
         tank = self._get_tank_data()
         if not tank:
@@ -221,7 +332,7 @@ class HAmexTankVolumeSensor(CoordinatorEntity, SensorEntity):
         return None
 
 
-class HAmexBatterySensor(CoordinatorEntity, SensorEntity):
+class HAmexBatterySensor(HAmexDeadbandMixin, CoordinatorEntity, SensorEntity):
     """Sensor for MEX device battery."""
 
     def __init__(
@@ -243,15 +354,14 @@ class HAmexBatterySensor(CoordinatorEntity, SensorEntity):
         self._attr_device_class = SensorDeviceClass.BATTERY
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_device_info = _get_tank_device_info(tank_id, tank_name, entry)
+        self._setup_deadband(entry, CONF_DEADBAND_BATTERY)
 
-    @property
-    def native_value(self) -> int | None:
-        """Return the state of the sensor."""
+    def _current_value(self) -> int | None:
+        """Return the current battery percentage."""
         tank = self._get_tank_data()
         return tank.get("BatteryPercentage") if tank else None
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
+    def _current_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
         tank = self._get_tank_data()
         if not tank:
@@ -370,6 +480,77 @@ class HAmexRemainingDaysSensor(CoordinatorEntity, SensorEntity):
         return None
 
 
+class HAmexLastRefillSensor(CoordinatorEntity, SensorEntity):
+    """Sensor for the volume delivered by the last detected refill."""
+
+    def __init__(
+        self,
+        coordinator: HAmexDataUpdateCoordinator,
+        sensor_id: int,
+        tank_id: int,
+        tank_name: str,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._sensor_id = sensor_id
+        self._tank_id = tank_id
+        self._tank_name = tank_name
+        self._attr_name = "Letzte Befüllung"
+        self._attr_unique_id = f"{DOMAIN}_{sensor_id}_last_refill"
+        self._attr_native_unit_of_measurement = UnitOfVolume.LITERS
+        self._attr_device_class = SensorDeviceClass.VOLUME
+        self._attr_icon = "mdi:tanker-truck"
+        self._attr_suggested_display_precision = 0
+        self._attr_device_info = _get_tank_device_info(tank_id, tank_name, entry)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the state of the sensor."""
+        state = self.coordinator.detector.get(self._sensor_id)
+        return state.last_refill_volume if state else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return additional state attributes."""
+        state = self.coordinator.detector.get(self._sensor_id)
+        if not state or not state.last_refill_time:
+            return {}
+
+        return {
+            "refill_time": state.last_refill_time.isoformat(),
+        }
+
+
+class HAmexLastRefillTimeSensor(CoordinatorEntity, SensorEntity):
+    """Sensor for the time of the last detected refill."""
+
+    def __init__(
+        self,
+        coordinator: HAmexDataUpdateCoordinator,
+        sensor_id: int,
+        tank_id: int,
+        tank_name: str,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._sensor_id = sensor_id
+        self._tank_id = tank_id
+        self._tank_name = tank_name
+        self._attr_name = "Letzte Befüllung Zeitpunkt"
+        self._attr_unique_id = f"{DOMAIN}_{sensor_id}_last_refill_time"
+        self._attr_device_class = SensorDeviceClass.TIMESTAMP
+        self._attr_icon = "mdi:calendar-check"
+        self._attr_device_info = _get_tank_device_info(tank_id, tank_name, entry)
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return the state of the sensor."""
+        state = self.coordinator.detector.get(self._sensor_id)
+        return state.last_refill_time if state else None
+
+
 # =============================================================================
 # Total/Summary Sensors (virtual device)
 # =============================================================================
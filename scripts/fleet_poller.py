@@ -0,0 +1,292 @@
+"""Poll many Heizoel24 MEX accounts without Home Assistant.
+
+Reads the accounts from a JSON file (a list of objects or one object per
+line, each with "username" and "password"), polls their dashboards
+concurrently and writes one normalized snapshot per tank as JSON lines or
+as Parquet row groups (requires pyarrow).
+
+Example:
+    python scripts/fleet_poller.py accounts.json -o tanks.jsonl --interval 3600
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import importlib
+import json
+import logging
+from pathlib import Path
+import sys
+import types
+from typing import Any, TextIO
+
+import aiohttp
+
+_LOGGER = logging.getLogger("fleet_poller")
+
+COMPONENT_DIR = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "heizoel24mex"
+)
+
+
+def _load_api() -> types.ModuleType:
+    """Import the integration's API client without its Home Assistant setup.
+
+    The package __init__ depends on Home Assistant, so the component
+    directory is mounted as a bare package and only api.py is imported.
+    """
+    package = types.ModuleType("_heizoel24mex")
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules[package.__name__] = package
+    return importlib.import_module(f"{package.__name__}.api")
+
+
+api = _load_api()
+
+
+def normalize_dashboard(
+    account: str, data: dict[str, Any], polled_at: datetime
+) -> list[dict[str, Any]]:
+    """Return one flat snapshot per tank of a dashboard payload."""
+    return [
+        {
+            "polled_at": polled_at.isoformat(),
+            "account": account,
+            "sensor_id": tank.get("SensorId"),
+            "tank_id": tank.get("TankId"),
+            "name": tank.get("MexName"),
+            "volume": tank.get("CurrentVolume"),
+            "percentage": tank.get("CurrentVolumePercentage"),
+            "max_volume": tank.get("MaxVolume"),
+            "battery": tank.get("BatteryPercentage"),
+            "usage": tank.get("Usage"),
+            "remaining_days": tank.get("RemainingDays"),
+            "measured_at": tank.get("LastMeasurementTimeStamp"),
+            "measurement_ok": tank.get("LastMeasurementWasSuccessfully"),
+        }
+        for tank in data.get("Items", [])
+    ]
+
+
+class JsonLinesWriter:
+    """Write snapshots as one JSON object per line."""
+
+    def __init__(self, file: TextIO) -> None:
+        """Initialize the writer."""
+        self._file = file
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        """Write snapshots."""
+        self._file.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def flush(self) -> None:
+        """Flush written snapshots."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the writer."""
+        self.flush()
+
+
+class ParquetWriter:
+    """Write snapshots as Parquet row groups of batch_size rows."""
+
+    def __init__(self, path: str, batch_size: int) -> None:
+        """Initialize the writer."""
+        try:
+            import pyarrow as pa  # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise SystemExit("Parquet output requires pyarrow") from err
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("polled_at", pa.string()),
+                ("account", pa.string()),
+                ("sensor_id", pa.int64()),
+                ("tank_id", pa.int64()),
+                ("name", pa.string()),
+                ("volume", pa.float64()),
+                ("percentage", pa.float64()),
+                ("max_volume", pa.float64()),
+                ("battery", pa.float64()),
+                ("usage", pa.float64()),
+                ("remaining_days", pa.int64()),
+                ("measured_at", pa.string()),
+                ("measurement_ok", pa.bool_()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._tables: list[Any] = []
+        self._rows = 0
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        """Buffer snapshots as columnar batches, writing full row groups.
+
+        Rows are converted right away, so snapshots which do not match the
+        schema are rejected here without affecting the buffered ones.
+        """
+        self._tables.append(self._pa.Table.from_pylist(rows, schema=self._schema))
+        self._rows += len(rows)
+        if self._rows >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered snapshots as a row group."""
+        if not self._rows:
+            return
+        self._writer.write_table(self._pa.concat_tables(self._tables))
+        self._tables = []
+        self._rows = 0
+
+    def close(self) -> None:
+        """Write remaining snapshots and close the file."""
+        self.flush()
+        self._writer.close()
+
+
+def load_accounts(path: str) -> list[dict[str, str]]:
+    """Load accounts from a JSON list or a JSON lines file."""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        accounts = json.loads(text)
+    else:
+        accounts = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    for account in accounts:
+        if not account.get("username") or not account.get("password"):
+            raise SystemExit(f"Account without username or password in {path}")
+    return accounts
+
+
+async def poll_round(
+    clients: dict[str, Any],
+    writer: JsonLinesWriter | ParquetWriter,
+    concurrency: int,
+) -> int:
+    """Poll every account once and write the snapshots as they arrive."""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def poll(
+        account: str, client: Any
+    ) -> tuple[str, list[dict[str, Any]] | None]:
+        try:
+            async with semaphore:
+                data = await client.get_dashboard_data()
+            return account, normalize_dashboard(
+                account, data, datetime.now(timezone.utc)
+            )
+        except api.HAmexApiError as err:
+            _LOGGER.warning("Polling %s failed: %s", account, err)
+        except Exception:  # pylint: disable=broad-except
+            # One account must not abort the round for all others
+            _LOGGER.exception("Unexpected error polling %s", account)
+        return account, None
+
+    tasks = [poll(account, client) for account, client in clients.items()]
+    for task in asyncio.as_completed(tasks):
+        account, rows = await task
+        if rows is None:
+            failures += 1
+            continue
+        try:
+            writer.write(rows)
+        except Exception:  # pylint: disable=broad-except
+            # E.g. a value which does not match the Parquet schema
+            failures += 1
+            _LOGGER.exception("Could not write snapshots of %s", account)
+
+    writer.flush()
+    return failures
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Poll the accounts until interrupted, or once without interval."""
+    accounts = load_accounts(args.accounts)
+
+    output = sys.stdout if args.output == "-" else None
+    if args.format == "parquet":
+        if output is not None:
+            raise SystemExit("Parquet output requires --output")
+        writer: JsonLinesWriter | ParquetWriter = ParquetWriter(
+            args.output, args.batch_size
+        )
+    else:
+        output = output or open(args.output, "a", encoding="utf-8")
+        writer = JsonLinesWriter(output)
+
+    # One connection pool for all accounts, one cookie jar per account
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    sessions = [
+        aiohttp.ClientSession(connector=connector, connector_owner=False)
+        for _ in accounts
+    ]
+    clients = {
+        account["username"]: api.HAmexApiClient(
+            username=account["username"],
+            password=account["password"],
+            session=session,
+            # Diagnostics are not available here, keep no payloads
+            history_size=0,
+        )
+        for account, session in zip(accounts, sessions)
+    }
+
+    try:
+        while True:
+            failures = await poll_round(clients, writer, args.concurrency)
+            _LOGGER.info(
+                "Polled %d accounts, %d failed", len(clients) - failures, failures
+            )
+            if not args.interval:
+                break
+            await asyncio.sleep(args.interval)
+    finally:
+        writer.close()
+        if output is not None and output is not sys.stdout:
+            output.close()
+        for session in sessions:
+            await session.close()
+        await connector.close()
+
+
+def main() -> None:
+    """Parse the arguments and run the poller."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accounts", help="JSON file with username/password objects")
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file, - for stdout (default)"
+    )
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument(
+        "--concurrency", type=int, default=20, help="accounts polled in parallel"
+    )
+    parser.add_argument(
+        "--interval", type=int, default=0, help="seconds between rounds, 0 to poll once"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=10000, help="rows per Parquet row group"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        stream=sys.stderr,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()